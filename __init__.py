@@ -1,5 +1,7 @@
 # /ComfyUI-Prompt-Formatter/__init__.py
 
+import sys
+
 # Ensure utils are loaded first to check dependencies
 from . import prompt_formatter_utils
 
@@ -31,8 +33,8 @@ NODE_DISPLAY_NAME_MAPPINGS = {
 
 __all__ = ['NODE_CLASS_MAPPINGS', 'NODE_DISPLAY_NAME_MAPPINGS']
 
-# Print loading info to console
-print("\n### Loading: ComfyUI-Prompt-Formatter (Version: 1.4.2) ###")
+# Print loading info to console (stderr keeps stdout clean for the batch service)
+print("\n### Loading: ComfyUI-Prompt-Formatter (Version: 1.4.2) ###", file=sys.stderr)
 for name, display_name in NODE_DISPLAY_NAME_MAPPINGS.items():
-    print(f"  - {name} -> {display_name}")
-print("###-------------------------------------------###\n")
\ No newline at end of file
+    print(f"  - {name} -> {display_name}", file=sys.stderr)
+print("###-------------------------------------------###\n", file=sys.stderr)
\ No newline at end of file
@@ -0,0 +1,8 @@
+# /ComfyUI-Prompt-Formatter/__main__.py
+# Run from ComfyUI/custom_nodes: python -m ComfyUI-Prompt-Formatter {format,analyze} --help
+
+import sys
+
+from .prompt_formatter_service import main
+
+sys.exit(main())
@@ -1,6 +1,5 @@
 # /ComfyUI-Prompt-Formatter/categorized_prompt_analyzer.py
 
-import yaml
 import re
 from collections import defaultdict
 
@@ -9,9 +8,7 @@ from .prompt_formatter_utils import (
     find_yaml_file,
     parse_tag,
     clean_output_string,
-    resolve_category_tags,
-    INCLUDE_DIRECTIVE,
-    TAGS_KEY
+    load_category_index,
 )
 
 class CategorizedPromptAnalyzer:
@@ -47,24 +44,14 @@ class CategorizedPromptAnalyzer:
 
     def analyze_prompt(self, prompt, analyze_targets, category_definition_file, **kwargs):
         # --- 1. Load & Resolve YAML ---
-        resolved_category_tags = {} 
         yaml_path = find_yaml_file(category_definition_file, self.NODE_NAME)
-        raw_yaml_data = None
-        
-        if yaml_path:
-            try:
-                with open(yaml_path, 'r', encoding='utf-8') as f: raw_yaml_data = yaml.safe_load(f)
-                if not isinstance(raw_yaml_data, dict): raw_yaml_data = None
-            except Exception as e: print(f"Error [{self.NODE_NAME}]: Loading YAML {yaml_path}: {e}")
+        category_index = load_category_index(yaml_path, self.NODE_NAME) if yaml_path else None
+        return self.analyze_with_index(prompt, analyze_targets, category_index, **kwargs)
 
+    def analyze_with_index(self, prompt, analyze_targets, category_index, **kwargs):
+        """Analyzes a prompt against an already loaded CategoryIndex (or None). Shared with the batch service."""
         case_sensitive = kwargs.get("case_sensitive_matching", False)
-        if raw_yaml_data:
-            cache = {}
-            for cat_name in list(raw_yaml_data.keys()):
-                 if str(cat_name).strip() not in[INCLUDE_DIRECTIVE, TAGS_KEY]:
-                    tags_set = resolve_category_tags(cat_name, raw_yaml_data, cache, self.NODE_NAME)
-                    key = str(cat_name).strip() if case_sensitive else str(cat_name).strip().lower()
-                    resolved_category_tags[key] = {t if case_sensitive else t.lower() for t in tags_set}
+        resolved_category_tags = category_index.category_tags(case_sensitive) if category_index else {}
 
         # --- 2. Parse Targets ---
         targets_info = []
@@ -73,7 +60,7 @@ class CategorizedPromptAnalyzer:
 
         for target in original_targets:
             norm_target = target if case_sensitive else target.lower()
-            tags_to_match = resolved_category_tags.get(norm_target, set())
+            tags_to_match = set(resolved_category_tags.get(norm_target, ())) # Shared index is read-only
             if not tags_to_match: # It's a literal tag, not a category
                 tags_to_match.add(norm_target)
                 if match_spaces:
@@ -1,6 +1,5 @@
 # /ComfyUI-Prompt-Formatter/categorized_prompt_formatter.py
 
-import yaml
 import re
 from collections import defaultdict
 
@@ -9,9 +8,7 @@ from .prompt_formatter_utils import (
     find_yaml_file,
     parse_tag,
     clean_output_string,
-    resolve_category_tags,
-    INCLUDE_DIRECTIVE,
-    TAGS_KEY
+    load_category_index,
 )
 
 class CategorizedPromptFormatter:
@@ -47,34 +44,14 @@ class CategorizedPromptFormatter:
 
     def format_prompt(self, prompt, category_definition_file, output_template, **kwargs):
         # --- 1. Load & Resolve Category Definitions ---
-        tag_to_categories_map = defaultdict(list)
         yaml_path = find_yaml_file(category_definition_file, self.NODE_NAME)
-        raw_yaml_data = None
-
-        if yaml_path:
-            try:
-                with open(yaml_path, 'r', encoding='utf-8') as f:
-                    raw_yaml_data = yaml.safe_load(f)
-                if not isinstance(raw_yaml_data, dict):
-                     print(f"Warning [{self.NODE_NAME}]: YAML file '{yaml_path}' is not a dictionary.")
-                     raw_yaml_data = None
-            except Exception as e:
-                 print(f"Error [{self.NODE_NAME}]: Loading YAML file {yaml_path}: {e}")
-
-        if raw_yaml_data:
-            resolved_tags_cache = {}
-            for cat_name in list(raw_yaml_data.keys()):
-                if str(cat_name).strip() not in[INCLUDE_DIRECTIVE, TAGS_KEY]:
-                    resolve_category_tags(cat_name, raw_yaml_data, resolved_tags_cache, self.NODE_NAME)
-
-            case_sensitive = kwargs.get("case_sensitive_matching", False)
-            for cat_name, tags_set in resolved_tags_cache.items():
-                for tag in tags_set:
-                    key = tag if case_sensitive else tag.lower()
-                    if key: tag_to_categories_map[key].append(cat_name)
-
-            for key in tag_to_categories_map:
-                tag_to_categories_map[key] = sorted(set(tag_to_categories_map[key]))
+        category_index = load_category_index(yaml_path, self.NODE_NAME) if yaml_path else None
+        return self.format_with_index(prompt, category_index, output_template, **kwargs)
+
+    def format_with_index(self, prompt, category_index, output_template, **kwargs):
+        """Formats a prompt against an already loaded CategoryIndex (or None). Shared with the batch service."""
+        case_sensitive = kwargs.get("case_sensitive_matching", False)
+        tag_to_categories_map = category_index.tag_to_categories(case_sensitive) if category_index else {}
         
         # --- 2. Parse Input Prompt & Categorize ---
         categorized_tags = defaultdict(list)
@@ -83,7 +60,6 @@ class CategorizedPromptFormatter:
 
         handle_weights = kwargs.get("handle_weights", True)
         match_spaces = kwargs.get("match_underscores_spaces", True)
-        case_sensitive = kwargs.get("case_sensitive_matching", False)
 
         for raw_tag in prompt.split(kwargs.get("input_delimiter", ",")):
             tag_original = raw_tag.strip() if kwargs.get("strip_whitespace", True) else raw_tag
@@ -1,6 +1,5 @@
 # /ComfyUI-Prompt-Formatter/categorized_random_prompt_formatter.py
 
-import yaml
 import re
 import random
 
@@ -8,9 +7,7 @@ import random
 from .prompt_formatter_utils import (
     find_yaml_file,
     clean_output_string,
-    resolve_category_tags,
-    INCLUDE_DIRECTIVE,
-    TAGS_KEY
+    load_category_index,
 )
 
 class CategorizedRandomPromptFormatter:
@@ -45,27 +42,11 @@ class CategorizedRandomPromptFormatter:
         rng = random.Random(used_seed)
 
         # --- 2. Load & Resolve Categories ---
-        resolved_categories = {}
         yaml_path = find_yaml_file(category_definition_file, self.NODE_NAME)
-        raw_yaml_data = None
-
-        if yaml_path:
-            try:
-                with open(yaml_path, 'r', encoding='utf-8') as f:
-                    raw_yaml_data = yaml.safe_load(f)
-                if not isinstance(raw_yaml_data, dict):
-                     print(f"Warning [{self.NODE_NAME}]: YAML file '{yaml_path}' is not a dictionary.")
-                     raw_yaml_data = None
-            except Exception as e:
-                 print(f"Error [{self.NODE_NAME}]: Loading YAML file {yaml_path}: {e}")
-
-        if raw_yaml_data:
-            cache = {}
-            for cat_name in list(raw_yaml_data.keys()):
-                if str(cat_name).strip() not in [INCLUDE_DIRECTIVE, TAGS_KEY]:
-                    resolved_categories[str(cat_name).strip()] = resolve_category_tags(cat_name, raw_yaml_data, cache, self.NODE_NAME)
-        else:
+        category_index = load_category_index(yaml_path, self.NODE_NAME) if yaml_path else None
+        if not category_index:
             return ("", used_seed)
+        resolved_categories = category_index.category_tags(case_sensitive=True)
 
         # --- 3. Process Template & Generate Prompt ---
         result_parts =[]
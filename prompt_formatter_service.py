@@ -0,0 +1,247 @@
+# /ComfyUI-Prompt-Formatter/prompt_formatter_service.py
+
+import argparse
+import json
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import islice
+
+# Local imports
+from .prompt_formatter_utils import find_yaml_file, load_category_index
+from .categorized_prompt_formatter import CategorizedPromptFormatter
+from .categorized_prompt_analyzer import CategorizedPromptAnalyzer
+
+# --- Constants ---
+SERVICE_NAME = "Prompt Formatter Service"
+DEFAULT_BATCH_SIZE = 64
+
+# mode -> (node class, method taking a preloaded CategoryIndex)
+SERVICE_MODES = {
+    "format": (CategorizedPromptFormatter, "format_with_index"),
+    "analyze": (CategorizedPromptAnalyzer, "analyze_with_index"),
+}
+
+# --- Batch Processing ---
+
+class PromptBatchProcessor:
+    """
+    Runs one node's logic over many prompts with the category definitions loaded once.
+    Results are produced by the node class itself, so they match a graph run exactly.
+    """
+    def __init__(self, mode: str, node_inputs: dict):
+        node_class, method_name = SERVICE_MODES[mode]
+        self.node = node_class()
+        self.node_inputs = dict(node_inputs)
+        self.category_definition_file = self.node_inputs.pop("category_definition_file")
+        self._process = getattr(self.node, method_name)
+
+        yaml_path = find_yaml_file(self.category_definition_file, SERVICE_NAME)
+        self.category_index = load_category_index(yaml_path, SERVICE_NAME) if yaml_path else None
+        if self.category_index is None:
+            print(f"Warning [{SERVICE_NAME}]: No categories loaded from '{self.category_definition_file}'.", file=sys.stderr)
+
+        # Separate the template/targets input from the keyword options to mirror the node signatures
+        self._positional_input = self.node_inputs.pop("output_template" if mode == "format" else "analyze_targets")
+        self._mode = mode
+
+    def process(self, prompt: str):
+        if self._mode == "format":
+            return self._process(prompt, self.category_index, self._positional_input, **self.node_inputs)
+        return self._process(prompt, self._positional_input, self.category_index, **self.node_inputs)
+
+    def process_with_node(self, prompt: str):
+        """Per-item node invocation (re-resolving the definition file every call), used as benchmark baseline."""
+        node_function = getattr(self.node, self.node.FUNCTION)
+        if self._mode == "format":
+            return node_function(prompt, self.category_definition_file, self._positional_input, **self.node_inputs)
+        return node_function(prompt, self._positional_input, self.category_definition_file, **self.node_inputs)
+
+    def to_record(self, record_id, result):
+        record = {} if record_id is None else {"id": record_id}
+        record.update(zip(self.node.RETURN_NAMES, result))
+        return record
+
+class ThroughputStats:
+    """Counts processed prompts and wall time for the throughput report."""
+    def __init__(self):
+        self.count = 0
+        self.started = time.perf_counter()
+        self.node_seconds = 0.0
+        self.service_seconds = 0.0
+        self.mismatches = 0
+
+    def report(self, benchmark: bool = False):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        print(f"[{SERVICE_NAME}] Processed {self.count} prompts in {elapsed:.3f}s ({self.count / elapsed:.1f} prompts/s).", file=sys.stderr)
+        if benchmark and self.count:
+            service_rate = self.count / max(self.service_seconds, 1e-9)
+            node_rate = self.count / max(self.node_seconds, 1e-9)
+            print(f"[{SERVICE_NAME}] Benchmark: service {service_rate:.1f} prompts/s, per-item node {node_rate:.1f} prompts/s "
+                  f"(x{service_rate / node_rate:.2f}), mismatches: {self.mismatches}.", file=sys.stderr)
+
+def iter_records(lines, input_format: str, source: str = "<input>"):
+    """
+    Yields (record_id, prompt) from text lines. 'text' treats every line as one prompt;
+    'jsonl' accepts a JSON string or an object with a 'prompt' key (and optional 'id').
+    """
+    for line_number, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        if input_format == "text":
+            yield None, line
+            continue
+        if not line.strip(): continue
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            print(f"Warning [{SERVICE_NAME}]: Skipping invalid JSON on line {line_number} of {source}: {e}", file=sys.stderr)
+            continue
+        if isinstance(item, str):
+            yield None, item
+        elif isinstance(item, dict) and isinstance(item.get("prompt"), str):
+            yield item.get("id"), item["prompt"]
+        else:
+            print(f"Warning [{SERVICE_NAME}]: Skipping line {line_number} of {source}: expected a string or an object with a 'prompt' string.", file=sys.stderr)
+
+def iter_batches(iterable, batch_size: int):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch: return
+        yield batch
+
+def stream_results(processor: PromptBatchProcessor, records, write, flush, batch_size: int, stats: ThroughputStats, benchmark: bool = False):
+    """Processes records batch by batch, writing one JSON line per prompt and flushing after each batch."""
+    for batch in iter_batches(records, batch_size):
+        for record_id, prompt in batch:
+            if benchmark:
+                start = time.perf_counter()
+                result = processor.process(prompt)
+                middle = time.perf_counter()
+                node_result = processor.process_with_node(prompt)
+                stats.service_seconds += middle - start
+                stats.node_seconds += time.perf_counter() - middle
+                if node_result != result: stats.mismatches += 1
+            else:
+                result = processor.process(prompt)
+            write(json.dumps(processor.to_record(record_id, result), ensure_ascii=False) + "\n")
+            stats.count += 1
+        flush()
+
+# --- Input Sources ---
+
+def _input_format_for(path: str, requested: str):
+    if requested != "auto": return requested
+    return "jsonl" if path.lower().endswith((".jsonl", ".ndjson")) else "text"
+
+def iter_input_records(paths, input_format: str):
+    for path in paths:
+        if path == "-":
+            yield from iter_records(sys.stdin, _input_format_for("", input_format), "<stdin>")
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            yield from iter_records(f, _input_format_for(path, input_format), path)
+
+# --- HTTP Endpoint ---
+
+def _iter_body_lines(rfile, content_length: int):
+    remaining = content_length
+    while remaining > 0:
+        line = rfile.readline(min(remaining, 65536))
+        if not line: return
+        remaining -= len(line)
+        yield line.decode("utf-8", errors="replace")
+
+def make_request_handler(processor: PromptBatchProcessor, batch_size: int, benchmark: bool = False):
+    class PromptServiceHandler(BaseHTTPRequestHandler):
+        """POST a batch of prompts (text lines, or JSONL with an ndjson/jsonl content type); results stream back as JSONL."""
+        protocol_version = "HTTP/1.0"
+
+        def do_POST(self):
+            try:
+                content_length = int(self.headers.get("Content-Length", 0))
+            except ValueError:
+                self.send_error(400, "Invalid Content-Length")
+                return
+            content_type = self.headers.get("Content-Type", "")
+            input_format = "jsonl" if "json" in content_type else "text"
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+            self.end_headers()
+
+            stats = ThroughputStats()
+            records = iter_records(_iter_body_lines(self.rfile, content_length), input_format, self.client_address[0])
+            stream_results(processor, records, lambda text: self.wfile.write(text.encode("utf-8")), self.wfile.flush, batch_size, stats, benchmark)
+            stats.report(benchmark)
+
+    return PromptServiceHandler
+
+def serve(processor: PromptBatchProcessor, address: str, batch_size: int, benchmark: bool = False):
+    host, _, port = address.rpartition(":")
+    server = ThreadingHTTPServer((host or "127.0.0.1", int(port)), make_request_handler(processor, batch_size, benchmark))
+    print(f"[{SERVICE_NAME}] Listening on http://{server.server_address[0]}:{server.server_address[1]}/", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+# --- Command Line ---
+
+def _add_node_arguments(parser: argparse.ArgumentParser, node_class):
+    """Exposes every node input except 'prompt' as a CLI option with the node's own default."""
+    input_types = node_class.INPUT_TYPES()
+    for section in ("required", "optional"):
+        for name, (input_type, options) in input_types.get(section, {}).items():
+            if name == "prompt": continue
+            flag = "--" + name.replace("_", "-")
+            default = options.get("default")
+            if isinstance(input_type, list):
+                parser.add_argument(flag, dest=name, choices=input_type, default=default)
+            elif input_type == "BOOLEAN":
+                parser.add_argument(flag, dest=name, action=argparse.BooleanOptionalAction, default=default)
+            elif input_type == "INT":
+                parser.add_argument(flag, dest=name, type=int, default=default)
+            else:
+                parser.add_argument(flag, dest=name, default=default)
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m ComfyUI-Prompt-Formatter",
+        description="Run the Categorized Prompt Formatter/Analyzer over many prompts outside ComfyUI. Results are written as JSONL.",
+    )
+    subparsers = parser.add_subparsers(dest="mode", required=True)
+    for mode, (node_class, _) in SERVICE_MODES.items():
+        sub = subparsers.add_parser(mode, help=f"Same behavior as the '{node_class.NODE_NAME}' node.")
+        _add_node_arguments(sub, node_class)
+        sub.add_argument("inputs", nargs="*", default=["-"], help="Input files; '-' reads stdin (default).")
+        sub.add_argument("--input-format", choices=["auto", "text", "jsonl"], default="auto",
+                         help="'text': one prompt per line. 'jsonl': JSON strings or objects with 'prompt'/'id'. 'auto' picks jsonl for .jsonl/.ndjson files.")
+        sub.add_argument("--output", default="-", help="Output JSONL file; '-' writes to stdout (default).")
+        sub.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Prompts processed between output flushes.")
+        sub.add_argument("--serve", metavar="[HOST:]PORT", help="Serve a local HTTP endpoint instead of reading inputs.")
+        sub.add_argument("--benchmark", action="store_true", help="Also run the per-item node invocation, compare results and report both throughputs.")
+    return parser
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    node_class, _ = SERVICE_MODES[args.mode]
+    node_input_names = [name for section in node_class.INPUT_TYPES().values() for name in section if name != "prompt"]
+    processor = PromptBatchProcessor(args.mode, {name: getattr(args, name) for name in node_input_names})
+    batch_size = max(1, args.batch_size)
+
+    if args.serve:
+        serve(processor, args.serve, batch_size, args.benchmark)
+        return 0
+
+    stats = ThroughputStats()
+    records = iter_input_records(args.inputs, args.input_format)
+    if args.output == "-":
+        stream_results(processor, records, sys.stdout.write, sys.stdout.flush, batch_size, stats, args.benchmark)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            stream_results(processor, records, f.write, f.flush, batch_size, stats, args.benchmark)
+    stats.report(args.benchmark)
+    return 0
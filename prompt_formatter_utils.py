@@ -1,9 +1,12 @@
 # /ComfyUI-Prompt-Formatter/prompt_formatter_utils.py
 
 import yaml
+import os
 import re
 import sys
+import threading
 from pathlib import Path
+from types import MappingProxyType
 
 # --- Dependency Check ---
 try:
@@ -17,6 +20,7 @@ except ImportError:
 # --- Constants ---
 INCLUDE_DIRECTIVE = "$include"
 TAGS_KEY = "tags"
+INDEX_CACHE_LIMIT = 16 # Max number of distinct YAML files kept resolved in memory
 
 # --- Path Utilities ---
 
@@ -153,4 +157,122 @@ def resolve_category_tags(category_name: str, yaml_data: dict, resolved_cache: d
         print(f"Warning [{node_name}]: Category '{category_name}' type '{type(category_data).__name__}' is not a list or dict.")
 
     resolved_cache[category_name] = final_tags
-    return final_tags
\ No newline at end of file
+    return final_tags
+
+# --- Shared Category Index ---
+
+class CategoryIndex:
+    """
+    Immutable, read-only snapshot of the resolved categories of one YAML file.
+    Instances are shared between node executions and threads, so nothing is ever
+    mutated after construction; a reload builds a new snapshot instead.
+    """
+    def __init__(self, source: str, raw_yaml_data: dict, node_name: str = "Prompt Formatter"):
+        resolved_cache = {}
+        category_names = []
+        for cat_name in list(raw_yaml_data.keys()):
+            if str(cat_name).strip() not in [INCLUDE_DIRECTIVE, TAGS_KEY]:
+                resolve_category_tags(cat_name, raw_yaml_data, resolved_cache, node_name)
+                category_names.append(str(cat_name).strip())
+
+        self.source = source
+        # Top-level category names in file order, and every resolved category (incl. referenced ones)
+        self.category_names = tuple(category_names)
+        self.categories = MappingProxyType({name: frozenset(tags) for name, tags in resolved_cache.items()})
+        self._views = {}
+        self._views_lock = threading.Lock()
+
+    def _get_view(self, key, builder):
+        view = self._views.get(key)
+        if view is None:
+            with self._views_lock:
+                view = self._views.get(key)
+                if view is None:
+                    view = builder()
+                    self._views = {**self._views, key: view}
+        return view
+
+    def category_tags(self, case_sensitive: bool = False):
+        """Read-only map of top-level category name -> frozenset of tags, normalized for matching."""
+        def build():
+            view = {}
+            for name in self.category_names:
+                tags = self.categories.get(name, frozenset())
+                key = name if case_sensitive else name.lower()
+                view[key] = tags if case_sensitive else frozenset(t.lower() for t in tags)
+            return MappingProxyType(view)
+        return self._get_view(("category_tags", case_sensitive), build)
+
+    def tag_to_categories(self, case_sensitive: bool = False):
+        """Read-only map of normalized tag -> sorted tuple of every category containing it."""
+        def build():
+            view = {}
+            for cat_name, tags_set in self.categories.items():
+                for tag in tags_set:
+                    key = tag if case_sensitive else tag.lower()
+                    if key: view.setdefault(key, set()).add(cat_name)
+            return MappingProxyType({key: tuple(sorted(cats)) for key, cats in view.items()})
+        return self._get_view(("tag_to_categories", case_sensitive), build)
+
+# Copy-on-write cache: path -> ((mtime_ns, size), CategoryIndex or None).
+# Readers never lock; writers replace the whole dict under _index_cache_lock.
+_index_cache = {}
+_index_cache_lock = threading.Lock()
+_index_build_locks = {}
+
+def _build_category_index(yaml_path: str, node_name: str):
+    try:
+        with open(yaml_path, 'r', encoding='utf-8') as f:
+            raw_yaml_data = yaml.safe_load(f)
+    except Exception as e:
+        print(f"Error [{node_name}]: Loading YAML file {yaml_path}: {e}")
+        return None
+    if not isinstance(raw_yaml_data, dict):
+        print(f"Warning [{node_name}]: YAML file '{yaml_path}' is not a dictionary.")
+        return None
+    if not raw_yaml_data: return None
+    return CategoryIndex(yaml_path, raw_yaml_data, node_name)
+
+def load_category_index(yaml_path, node_name: str = "Prompt Formatter"):
+    """
+    Returns the shared CategoryIndex for a YAML file, or None if it holds no usable categories.
+    The file is parsed once per modification; concurrent first requests wait for a single build.
+    """
+    key = str(Path(yaml_path).resolve())
+    try:
+        stat = os.stat(key)
+    except OSError as e:
+        print(f"Error [{node_name}]: Loading YAML file {yaml_path}: {e}")
+        return None
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    entry = _index_cache.get(key)
+    if entry is not None and entry[0] == stamp: return entry[1]
+
+    with _index_cache_lock:
+        build_lock = _index_build_locks.setdefault(key, threading.Lock())
+    with build_lock:
+        # Another thread may have finished the rebuild while we were waiting
+        entry = _index_cache.get(key)
+        if entry is not None and entry[0] == stamp: return entry[1]
+
+        index = _build_category_index(key, node_name)
+        _store_category_index(key, stamp, index)
+        return index
+
+def _store_category_index(key: str, stamp: tuple, index):
+    global _index_cache
+    with _index_cache_lock:
+        new_cache = {k: v for k, v in _index_cache.items() if k != key}
+        new_cache[key] = (stamp, index)
+        while len(new_cache) > INDEX_CACHE_LIMIT:
+            evicted = next(iter(new_cache))
+            del new_cache[evicted]
+            _index_build_locks.pop(evicted, None)
+        _index_cache = new_cache
+
+def clear_category_index_cache():
+    """Drops all cached category indexes; the next load re-reads the YAML files."""
+    global _index_cache
+    with _index_cache_lock:
+        _index_cache = {}